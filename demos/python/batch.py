@@ -0,0 +1,164 @@
+import json
+import os
+import sys
+import time
+import uuid
+
+if len(sys.argv) < 3:
+	print("Usage: python batch.py <folder or prompts.jsonl> <output.jsonl>")
+	sys.exit(1)
+
+from concurrent.futures import ThreadPoolExecutor
+from google import genai
+from google.genai import types
+import uploads
+
+client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+
+# Batch jobs trade latency (up to a day) for half price and no per-item round trips,
+# good for nightly runs over a folder of images or a file of prompts.
+JOB_DEADLINE = 24 * 3600
+MODEL = "gemini-2.0-flash"
+PROMPT = os.environ.get("BATCH_PROMPT", "Describe what you see in this image in one sentence only.")
+BATCH_SIZE = int(os.environ.get("BATCH_SIZE", 1000))
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", 8))
+POLL_START = float(os.environ.get("BATCH_POLL_START", 30))
+POLL_MAX = float(os.environ.get("BATCH_POLL_MAX", 600))
+
+IMAGE_TYPES = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.heic', '.heif')
+
+FINISHED = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+def readItems(source):
+	# A folder gives one item per image using PROMPT, a JSONL file has {"prompt": ..., "file": ...} lines.
+	if os.path.isdir(source):
+		return [
+			{"prompt": PROMPT, "file": os.path.join(source, file)} for file in sorted(os.listdir(source))
+			if file.lower().endswith(IMAGE_TYPES) and os.path.isfile(os.path.join(source, file))
+		]
+	with open(source, encoding="utf-8") as file:
+		return [json.loads(line) for line in file if line.strip()]
+
+def buildRequest(item, file_ref):
+	parts = [{"text": item["prompt"]}]
+	if file_ref is not None:
+		parts.append({"fileData": {"fileUri": file_ref.uri, "mimeType": file_ref.mime_type}})
+	return {"contents": [{"role": "user", "parts": parts}]}
+
+class Checkpoint:
+	# Which jobs exist, how many of them are already in the output, and how long the output was
+	# at that point, so a restart picks up the same jobs and never writes a line twice.
+	def __init__(self, output):
+		self.path = f"{output}.checkpoint.json"
+		self.state = {"jobs": [], "written": 0, "bytes": 0}
+		if os.path.exists(self.path):
+			with open(self.path, encoding="utf-8") as file:
+				self.state = json.load(file)
+
+	def save(self):
+		tmp = f"{self.path}.tmp"
+		with open(tmp, "w", encoding="utf-8") as file:
+			json.dump(self.state, file, indent=2)
+		os.replace(tmp, self.path)
+
+def submit(items, job, output):
+	start, end = job["start"], job["end"]
+	def uploadFile(item):
+		# A cached upload has to outlive the job, or the job points at an expired file.
+		return uploads.upload(client, item["file"], lifetime=JOB_DEADLINE) if item.get("file") else None
+	with ThreadPoolExecutor(UPLOAD_WORKERS) as pool:
+		file_refs = list(pool.map(uploadFile, items[start:end]))
+
+	requests_path = f"{output}.{start}.requests.jsonl"
+	with open(requests_path, "w", encoding="utf-8") as file:
+		for index, (item, file_ref) in enumerate(zip(items[start:end], file_refs), start):
+			file.write(json.dumps({"key": str(index), "request": buildRequest(item, file_ref)}) + "\n")
+	src = client.files.upload(
+		file=requests_path,
+		config=types.UploadFileConfig(display_name=os.path.basename(requests_path), mime_type="jsonl")
+	)
+	os.remove(requests_path)
+
+	batch = client.batches.create(
+		model=MODEL, src=src.name,
+		config=types.CreateBatchJobConfig(display_name=job["display_name"])
+	)
+	print(f"Submitted {batch.name} for items {start} to {end - 1}.")
+	return batch.name
+
+def collect(job, batch):
+	records = {}
+	if batch.state.name == "JOB_STATE_SUCCEEDED":
+		data = client.files.download(file=batch.dest.file_name)
+		for line in data.decode("utf-8").splitlines():
+			if not line.strip():
+				continue
+			row = json.loads(line)
+			index = int(row["key"])
+			if row.get("response"):
+				response = types.GenerateContentResponse.model_validate(row["response"])
+				records[index] = {"index": index, "text": response.text}
+			else:
+				records[index] = {"index": index, "error": row.get("error")}
+	error = batch.error.message if batch.error else batch.state.name
+	return [records.get(index, {"index": index, "error": error}) for index in range(job["start"], job["end"])]
+
+def run(source, output):
+	items = readItems(source)
+	checkpoint = Checkpoint(output)
+	jobs = checkpoint.state["jobs"]
+
+	# Each job goes into the checkpoint before it is created, so a run that died in between can
+	# find it by display name on restart instead of submitting (and paying for) it twice.
+	submitted = None
+	for job in jobs:
+		if job["name"] is None:
+			if submitted is None:
+				submitted = {batch.display_name: batch.name for batch in client.batches.list()}
+			job["name"] = submitted.get(job["display_name"]) or submit(items, job, output)
+			checkpoint.save()
+
+	# Part of the display name, so jobs from an earlier checkpoint for the same output never match.
+	runId = checkpoint.state.setdefault("run", uuid.uuid4().hex[:8])
+	for start in range(jobs[-1]["end"] if jobs else 0, len(items), BATCH_SIZE):
+		job = {"name": None, "display_name": f"{os.path.basename(output)}-{runId}-{start}", "start": start, "end": min(start + BATCH_SIZE, len(items))}
+		jobs.append(job)
+		checkpoint.save()
+		job["name"] = submit(items, job, output)
+		checkpoint.save()
+
+	# Anything past the last checkpoint came from a run that died mid-write.
+	if os.path.exists(output):
+		os.truncate(output, checkpoint.state["bytes"])
+
+	finished = {}
+	delay = POLL_START
+	with open(output, "ab") as out:
+		while checkpoint.state["written"] < len(jobs):
+			for number in range(checkpoint.state["written"], len(jobs)):
+				if number in finished:
+					continue
+				batch = client.batches.get(name=jobs[number]["name"])
+				if batch.state.name in FINISHED:
+					print(f"{batch.name} finished: {batch.state.name}")
+					finished[number] = collect(jobs[number], batch)
+
+			# Write results as soon as every job before them is written too, so the output stays in order.
+			progressed = False
+			while checkpoint.state["written"] in finished:
+				for record in finished.pop(checkpoint.state["written"]):
+					out.write((json.dumps(record) + "\n").encode("utf-8"))
+				out.flush()
+				os.fsync(out.fileno())
+				checkpoint.state["written"] += 1
+				checkpoint.state["bytes"] = out.tell()
+				checkpoint.save()
+				progressed = True
+
+			if checkpoint.state["written"] < len(jobs):
+				delay = POLL_START if progressed else min(delay * 2, POLL_MAX)
+				time.sleep(delay)
+
+	print(f"Wrote {len(items)} results to {output}.")
+
+run(sys.argv[1], sys.argv[2])
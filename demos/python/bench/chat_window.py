@@ -0,0 +1,57 @@
+import os
+import time
+import harness
+from google import genai
+from google.genai import types
+from windowed_chat import WindowedChat
+
+# BENCH_TURNS (500) turns of chat.py's WindowedChat against mock_server.py, with the full history
+# resent every turn and with each of the window settings. Prints per-turn latency and how big the
+# request body was at a few points along the way. The mock's latency doesn't grow with the prompt
+# the way a real model's does, so the latency columns only show what happens on our side.
+#
+#   python bench/chat_window.py       BENCH_TURNS (500) and MOCK_DELAY (0.01s) to change the setup
+
+TURNS = int(os.environ.get("BENCH_TURNS", 500))
+DELAY = float(os.environ.get("MOCK_DELAY", 0.01))
+MESSAGE = "Tell me a bit more about that, and how it relates to what we said earlier. "
+CHECKPOINTS = [turn for turn in (1, 100, 250, 500) if turn <= TURNS]
+SETTINGS = [
+	("full history", {}),
+	("CHAT_MAX_TURNS=20", {"max_turns": 20}),
+	("CHAT_MAX_TOKENS=3000", {"max_tokens": 3000}),
+	("+ CHAT_SUMMARIZE=1", {"max_tokens": 3000, "summarize": True}),
+]
+
+def run(url, settings):
+	sizes = []
+	def record(request):
+		if request.url.path.endswith(":generateContent"):
+			sizes.append(len(request.content))
+	client = genai.Client(api_key="bench", http_options={"base_url": url, "client_args": {"event_hooks": {"request": [record]}}})
+	chat = WindowedChat(
+		client, "gemini-2.0-flash",
+		config=types.GenerateContentConfig(system_instruction="You are a helpful assistant."),
+		**settings
+	)
+	latencies = []
+	turnSizes = []
+	for turn in range(TURNS):
+		sizes.clear()
+		start = time.perf_counter()
+		chat.send_message(f"{MESSAGE}({turn + 1})")
+		latencies.append((time.perf_counter() - start) * 1000)
+		# When the window gets summarized the summary call comes after the turn's own request.
+		turnSizes.append(sizes[0])
+	client.close()
+	return latencies, turnSizes
+
+with harness.mock(DELAY) as server:
+	results = [(name, *run(server.url, settings)) for name, settings in SETTINGS]
+
+print(f"{TURNS} turns, {DELAY * 1000:.0f}ms per model call")
+header = "".join(f"{f'KB @{turn}':>9}" for turn in CHECKPOINTS)
+print(f"  {'':<22}{'p50 ms':>8}{'p95 ms':>8}{header}")
+for name, latencies, turnSizes in results:
+	row = "".join(f"{turnSizes[turn - 1] / 1024:>9.1f}" for turn in CHECKPOINTS)
+	print(f"  {name:<22}{harness.percentile(latencies, 50):>8.1f}{harness.percentile(latencies, 95):>8.1f}{row}")
@@ -0,0 +1,67 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# Shared bits for the benchmarks in this folder: start mock_server.py or replay_server.py on a
+# free port, and run demos against it.
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+DEMOS = os.path.dirname(BENCH)
+sys.path.insert(0, DEMOS)
+
+def freePort():
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		return sock.getsockname()[1]
+
+def waitForPort(port, process, timeout=30):
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		if process.poll() is not None:
+			raise RuntimeError(f"Server exited with {process.returncode}")
+		try:
+			with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+				return
+		except OSError:
+			time.sleep(0.01)
+	raise RuntimeError(f"Nothing listening on {port} after {timeout}s")
+
+class Server:
+	# Runs one of the stand-in servers for the length of a with block.
+	def __init__(self, script, args=(), env=None, portVariable="MOCK_PORT"):
+		self.port = freePort()
+		self.url = f"http://127.0.0.1:{self.port}"
+		self.command = [sys.executable, os.path.join(DEMOS, script), *args]
+		self.env = {**os.environ, **(env or {}), portVariable: str(self.port)}
+
+	def __enter__(self):
+		self.started = time.perf_counter()
+		self.process = subprocess.Popen(self.command, env=self.env, stdout=subprocess.DEVNULL)
+		waitForPort(self.port, self.process)
+		self.ready = time.perf_counter() - self.started
+		return self
+
+	def __exit__(self, *exc):
+		self.process.terminate()
+		self.process.wait()
+
+def mock(delay=0.05, **env):
+	return Server("mock_server.py", env={"MOCK_DELAY": str(delay), **env})
+
+def demoEnv(url, **extra):
+	return {**os.environ, "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "bench"), "GOOGLE_GEMINI_BASE_URL": url, **extra}
+
+def runDemo(script, args, env, cwd=None):
+	result = subprocess.run(
+		[sys.executable, os.path.join(DEMOS, script), *args],
+		env=env, cwd=cwd, capture_output=True, text=True
+	)
+	if result.returncode != 0:
+		raise RuntimeError(f"{script} failed:\n{result.stderr}")
+	return result.stdout
+
+def percentile(values, p):
+	values = sorted(values)
+	return values[max(0, min(len(values) - 1, -(-len(values) * p // 100) - 1))]
@@ -0,0 +1,76 @@
+import base64
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import harness  # puts the demos folder on sys.path
+from image_stream import ImageStream
+
+# Checks make_image.py's ImageStream against every way the network might split a response: feeds
+# the same SSE stream in random chunkings (plus a few known bad splits) and checks that exactly
+# the expected files come out, with the right bytes and names, and no .part files left over.
+#
+#   python bench/image_chunks.py      BENCH_CHUNKINGS (500) random splits per stream
+
+CHUNKINGS = int(os.environ.get("BENCH_CHUNKINGS", 500))
+
+def event(parts, **extra):
+	return b"data: " + json.dumps({"candidates": [{"content": {"role": "model", "parts": parts}, **extra}]}).encode("utf-8") + b"\r\n\r\n"
+
+def image(data, mime_type="image/png"):
+	return {"inlineData": {"mimeType": mime_type, "data": base64.b64encode(data).decode("ascii")}}
+
+ONE = os.urandom(3000)
+TWO = os.urandom(1001)
+STREAMS = {
+	"one": (
+		event([{"text": "Here is "}]) + event([{"text": "your image."}, image(ONE)]) + event([{"text": ""}], finishReason="STOP"),
+		{"one.png": ONE},
+	),
+	"two": (
+		event([image(ONE)]) + event([{"text": "and a \"data\": \"lookalike\" in text"}]) + event([image(TWO, "image/jpeg")]),
+		{"two-1.png": ONE, "two-2.jpg": TWO},
+	),
+}
+# The closing quote, the rest of the event and the boundary each in their own chunk.
+KNOWN = {
+	"y": (
+		[b'data: {"candidates": [{"content": {"parts": [{"inlineData": {"mimeType": "image/png", "data": "QUJD', b'"}', b'}]}}]}\r\n\r\n'],
+		{"y.png": b"ABC"},
+	),
+}
+
+def run(name, chunks, expected):
+	os.makedirs("output")
+	stream = ImageStream(name)
+	with contextlib.redirect_stdout(io.StringIO()):
+		for chunk in chunks:
+			stream.feed(chunk)
+		stream.close()
+	found = {}
+	for file in os.listdir("output"):
+		with open(os.path.join("output", file), "rb") as data:
+			found[file] = data.read()
+	for file in os.listdir("output"):
+		os.remove(os.path.join("output", file))
+	os.rmdir("output")
+	assert found == expected, f"{name} split at {[len(chunk) for chunk in chunks]} gave {sorted(found)}, expected {sorted(expected)}"
+
+def split(data):
+	offsets = sorted(random.sample(range(1, len(data)), random.randint(1, min(len(data) - 1, 200))))
+	return [data[start:end] for start, end in zip([0] + offsets, offsets + [len(data)])]
+
+with tempfile.TemporaryDirectory() as folder:
+	os.chdir(folder)
+	for name, (chunks, expected) in KNOWN.items():
+		run(name, chunks, expected)
+	for name, (data, expected) in STREAMS.items():
+		run(name, [data], expected)
+		for size in (1, 2, 3, 5, 16, 17):
+			run(name, [data[offset:offset + size] for offset in range(0, len(data), size)], expected)
+		for _ in range(CHUNKINGS):
+			run(name, split(data), expected)
+
+print(f"ImageStream OK on {len(KNOWN)} known splits and {len(STREAMS) * (CHUNKINGS + 7)} chunkings")
@@ -0,0 +1,61 @@
+import os
+import re
+import sys
+import tempfile
+import harness
+
+# Peak memory and throughput of make_image.py, which streams images to disk, against what it did
+# before: one SDK generate_content call per prompt holding the whole answer in memory. Both run
+# as their own process against mock_server.py so peak RSS is theirs alone.
+#
+#   python bench/image_memory.py      BENCH_PROMPTS (16), MOCK_IMAGE_BYTES (4MB) and MOCK_DELAY (0.05s)
+
+PROMPTS = int(os.environ.get("BENCH_PROMPTS", 16))
+IMAGE_BYTES = int(os.environ.get("MOCK_IMAGE_BYTES", 4 * 1024 * 1024))
+DELAY = float(os.environ.get("MOCK_DELAY", 0.05))
+
+# The old make_image.py, looped over the prompts.
+OLD = """
+import os, resource, sys, time
+from google import genai
+from google.genai import types
+from slugify import slugify
+os.makedirs("./output", exist_ok=True)
+client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+start = time.perf_counter()
+for prompt in sys.argv[1:]:
+	response = client.models.generate_content(
+		model="models/gemini-2.0-flash-exp", contents=prompt,
+		config=types.GenerateContentConfig(response_modalities=["Text", "Image"])
+	)
+	for part in response.candidates[0].content.parts:
+		if part.inline_data is not None:
+			with open(f"output/{slugify(prompt)}.png", "wb") as file:
+				file.write(part.inline_data.data)
+elapsed = time.perf_counter() - start
+print(f"{len(sys.argv) - 1} images in {elapsed:.1f}s, {(len(sys.argv) - 1) / elapsed:.2f} images/sec.")
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"Peak RSS {peak // (1024 * 1024 if sys.platform == 'darwin' else 1024)}MB.")
+"""
+
+def measure(output):
+	return float(re.search(r"([\d.]+) images/sec", output).group(1)), int(re.search(r"Peak RSS (\d+)MB", output).group(1))
+
+prompts = [f"A cat on a windowsill, picture {number}" for number in range(PROMPTS)]
+with harness.mock(DELAY, MOCK_IMAGE_BYTES=str(IMAGE_BYTES)) as server:
+	env = harness.demoEnv(server.url)
+	with tempfile.TemporaryDirectory() as folder:
+		script = os.path.join(folder, "old_make_image.py")
+		with open(script, "w", encoding="utf-8") as file:
+			file.write(OLD)
+		before = measure(harness.runDemo(script, prompts, env, cwd=folder))
+	with tempfile.TemporaryDirectory() as folder:
+		after = measure(harness.runDemo("make_image.py", prompts, env, cwd=folder))
+		saved = sorted(os.listdir(os.path.join(folder, "output")))
+		if len(saved) != PROMPTS or any(not name.endswith(".png") for name in saved):
+			sys.exit(f"make_image.py saved {saved}")
+
+print(f"{PROMPTS} prompts, {IMAGE_BYTES / (1024 * 1024):.0f}MB images, {DELAY * 1000:.0f}ms per model call")
+print(f"  {'':<24}{'images/sec':>12}{'peak RSS':>10}")
+print(f"  {'SDK, whole response':<24}{before[0]:>12.2f}{before[1]:>8}MB")
+print(f"  {'make_image.py':<24}{after[0]:>12.2f}{after[1]:>8}MB")
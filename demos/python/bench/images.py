@@ -0,0 +1,46 @@
+import os
+import re
+import sys
+import tempfile
+import time
+import harness
+
+# Captioning throughput of image2.py's bulk mode against the old one-image-at-a-time loop,
+# both against mock_server.py.
+#
+#   python bench/images.py            BENCH_IMAGES (200) and MOCK_DELAY (0.05s) to change the setup
+
+IMAGES = int(os.environ.get("BENCH_IMAGES", 200))
+DELAY = float(os.environ.get("MOCK_DELAY", 0.05))
+
+def makeFolder(folder):
+	for number in range(IMAGES):
+		with open(os.path.join(folder, f"image{number}.png"), "wb") as file:
+			file.write(os.urandom(2048))
+
+def sequential(url, folder):
+	# What image2.py did before: upload, caption, next.
+	from google import genai
+	client = genai.Client(api_key="bench", http_options={"base_url": url})
+	start = time.perf_counter()
+	for file in sorted(os.listdir(folder)):
+		file_ref = client.files.upload(file=os.path.join(folder, file))
+		client.models.generate_content(
+			model="gemini-2.0-flash", contents=["Describe what you see in this image in one sentence only.", file_ref]
+		)
+	elapsed = time.perf_counter() - start
+	client.close()
+	return IMAGES / elapsed
+
+def bulk(url, folder):
+	output = harness.runDemo("image2.py", [folder], harness.demoEnv(url))
+	return float(re.search(r"([\d.]+) images/sec", output).group(1))
+
+with tempfile.TemporaryDirectory() as folder, harness.mock(DELAY) as server:
+	makeFolder(folder)
+	before = sequential(server.url, folder)
+	after = bulk(server.url, folder)
+
+print(f"{IMAGES} images, {DELAY * 1000:.0f}ms per model call")
+print(f"  one at a time     {before:8.1f} images/sec")
+print(f"  image2.py bulk    {after:8.1f} images/sec  ({after / before:.1f}x)")
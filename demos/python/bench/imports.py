@@ -0,0 +1,54 @@
+import os
+import re
+import subprocess
+import sys
+import time
+import harness
+
+# Startup cost of the demos: how long `from google import genai` takes, and how long a demo takes
+# to print its usage when called wrong (those check their arguments before importing the SDK).
+# Exits with 1 when the median of either is over budget, so it can run as a check.
+#
+#   python bench/imports.py           IMPORT_BUDGET_MS (1500), USAGE_BUDGET_MS (300), BENCH_RUNS (5)
+
+IMPORT_BUDGET = float(os.environ.get("IMPORT_BUDGET_MS", 1500))
+USAGE_BUDGET = float(os.environ.get("USAGE_BUDGET_MS", 300))
+RUNS = int(os.environ.get("BENCH_RUNS", 5))
+# image2.py falls back to ../images without arguments, so it gets a folder that isn't there.
+USAGE_DEMOS = [["batch.py"], ["image2.py", "no-such-folder"], ["make_image.py"]]
+TOP = 10
+
+def median(command, fails=False):
+	times = []
+	for _ in range(RUNS):
+		start = time.perf_counter()
+		result = subprocess.run(command, capture_output=True, cwd=harness.DEMOS)
+		times.append((time.perf_counter() - start) * 1000)
+		if fails and result.returncode == 0:
+			raise RuntimeError(f"{command[1]} didn't stop at its usage message")
+	return sorted(times)[len(times) // 2]
+
+def slowestModules():
+	# -X importtime prints "import time: self [us] | cumulative | package" for every module.
+	result = subprocess.run([sys.executable, "-X", "importtime", "-c", "from google import genai"], capture_output=True, text=True)
+	rows = []
+	for line in result.stderr.splitlines():
+		match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (.*)", line)
+		if match:
+			rows.append((int(match.group(1)), int(match.group(2)), match.group(3).strip()))
+	return sorted(rows, reverse=True)[:TOP]
+
+over = False
+sdk = median([sys.executable, "-c", "from google import genai"])
+over |= sdk > IMPORT_BUDGET
+print(f"from google import genai  {sdk:7.0f}ms  (budget {IMPORT_BUDGET:.0f}ms){'  OVER' if sdk > IMPORT_BUDGET else ''}")
+for demo in USAGE_DEMOS:
+	usage = median([sys.executable, *demo], fails=True)
+	over |= usage > USAGE_BUDGET
+	print(f"{demo[0] + ' usage':<25}{usage:7.0f}ms  (budget {USAGE_BUDGET:.0f}ms){'  OVER' if usage > USAGE_BUDGET else ''}")
+
+print(f"\nSlowest {TOP} modules by self time:")
+for own, cumulative, module in slowestModules():
+	print(f"  {own / 1000:7.1f}ms  {cumulative / 1000:7.1f}ms cumulative  {module}")
+
+sys.exit(1 if over else 0)
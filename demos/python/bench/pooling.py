@@ -0,0 +1,34 @@
+import os
+import time
+import harness
+from google import genai
+
+# Latency of BENCH_CALLS (1000) small sequential generate_content calls against mock_server.py,
+# once over the client's pooled keep-alive connection and once with "Connection: close" so every
+# call opens a new one, which is what the SDK did before it kept a pool. Plain HTTP, so the TLS
+# handshake a real endpoint adds on every new connection isn't in these numbers.
+
+CALLS = int(os.environ.get("BENCH_CALLS", 1000))
+DELAY = float(os.environ.get("MOCK_DELAY", 0))
+
+def run(url, headers):
+	client = genai.Client(api_key="bench", http_options={"base_url": url, "headers": headers})
+	for _ in range(20):
+		client.models.generate_content(model="gemini-2.0-flash", contents="hi")
+	latencies = []
+	for _ in range(CALLS):
+		start = time.perf_counter()
+		client.models.generate_content(model="gemini-2.0-flash", contents="hi")
+		latencies.append((time.perf_counter() - start) * 1000)
+	client.close()
+	return latencies
+
+with harness.mock(DELAY) as server:
+	pooled = run(server.url, {})
+	unpooled = run(server.url, {"Connection": "close"})
+
+print(f"{CALLS} sequential calls, {DELAY * 1000:.0f}ms per model call, ms per call:")
+print(f"  {'':<10}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}")
+for name, latencies in (("pooled", pooled), ("unpooled", unpooled)):
+	row = "".join(f"{harness.percentile(latencies, p):>8.2f}" for p in (50, 95, 99))
+	print(f"  {name:<10}{sum(latencies) / len(latencies):>8.2f}{row}")
@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import httpx
+import harness
+from google import genai
+
+# replay_server.py under load. Records BENCH_DISTINCT (100) different generateContent calls through
+# it from mock_server.py, pads the store out to BENCH_STORE (100000) lines with made-up keys, then
+# reports how long startup and indexing take next to an empty store, and the req/s playback
+# serves to BENCH_THREADS (16) threads with keep-alive clients for BENCH_SECONDS (5).
+
+DISTINCT = int(os.environ.get("BENCH_DISTINCT", 100))
+STORE = int(os.environ.get("BENCH_STORE", 100000))
+THREADS = int(os.environ.get("BENCH_THREADS", 16))
+SECONDS = float(os.environ.get("BENCH_SECONDS", 5))
+
+def record(path):
+	# The SDK makes the requests, the event hook keeps a copy to send again on playback.
+	sent = []
+	def keep(request):
+		sent.append((request.method, request.url.raw_path.decode("ascii"), request.read()))
+	with harness.mock(0) as upstream:
+		with harness.Server("replay_server.py", ["record", path], {"REPLAY_UPSTREAM": upstream.url}, "REPLAY_PORT") as recorder:
+			client = genai.Client(api_key="bench", http_options={"base_url": recorder.url, "client_args": {"event_hooks": {"request": [keep]}}})
+			for number in range(DISTINCT):
+				client.models.generate_content(model="gemini-2.0-flash", contents=f"Question number {number}?")
+			client.close()
+	return sent
+
+def pad(path):
+	with open(path, encoding="utf-8") as file:
+		recorded = [json.loads(line) for line in file]
+	with open(path, "a", encoding="utf-8") as file:
+		for number in range(STORE - len(recorded)):
+			line = dict(recorded[number % len(recorded)], key=uuid.uuid4().hex * 2)
+			file.write(json.dumps(line) + "\n")
+
+def hammer(url, requests):
+	counts = []
+	failures = []
+	deadline = time.perf_counter() + SECONDS
+	def worker(offset):
+		count = 0
+		with httpx.Client(base_url=url) as client:
+			while time.perf_counter() < deadline:
+				method, path, body = requests[(offset + count) % len(requests)]
+				response = client.request(method, path, content=body)
+				if response.status_code != 200:
+					failures.append(response.status_code)
+				count += 1
+		counts.append(count)
+	threads = [threading.Thread(target=worker, args=(number,)) for number in range(THREADS)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	if failures:
+		raise RuntimeError(f"{len(failures)} playback requests failed, first with {failures[0]}")
+	return sum(counts) / SECONDS
+
+with tempfile.TemporaryDirectory() as folder:
+	empty = os.path.join(folder, "empty.jsonl")
+	store = os.path.join(folder, "store.jsonl")
+	open(empty, "w").close()
+	requests = record(store)
+	pad(store)
+	megabytes = os.path.getsize(store) / (1024 * 1024)
+	with harness.Server("replay_server.py", ["play", empty], portVariable="REPLAY_PORT") as server:
+		emptyReady = server.ready
+	with harness.Server("replay_server.py", ["play", store], portVariable="REPLAY_PORT") as server:
+		ready = server.ready
+		throughput = hammer(server.url, requests)
+
+print(f"Store of {STORE} lines ({megabytes:.0f}MB), {DISTINCT} distinct requests played back")
+print(f"  startup, empty store      {emptyReady * 1000:8.0f}ms")
+print(f"  startup, full store       {ready * 1000:8.0f}ms  ({(ready - emptyReady) * 1000:.0f}ms indexing)")
+print(f"  playback, {THREADS} threads     {throughput:8.0f} req/s")
@@ -0,0 +1,72 @@
+import json
+import os
+import random
+import time
+import harness  # puts the demos folder on sys.path
+from json_stream import ArrayItems
+
+# json_stream.ArrayItems against waiting for the whole answer and calling json.loads once, on a
+# BENCH_MB (10) MB {"answers": [...]} document fed in BENCH_CHUNK (2048) character chunks. Time
+# to first item is CPU time plus how much of the answer had to arrive first; over a real stream
+# that second number is what matters. Also checks ArrayItems against json.loads on random
+# chunkings, so every escape and string end lands on a chunk boundary somewhere.
+
+MB = float(os.environ.get("BENCH_MB", 10))
+CHUNK = int(os.environ.get("BENCH_CHUNK", 2048))
+
+def makeDocument():
+	answers = []
+	size = 0
+	while size < MB * 1024 * 1024:
+		number = len(answers)
+		answer = {
+			"answer": f"Answer {number} with \"quotes\", a \\ backslash, [brackets] and {{braces}} " * 4,
+			"referenceURL": f"https://example.com/{number}",
+			"tags": [f"tag{tag}" for tag in range(number % 5)],
+		}
+		answers.append(answer)
+		size += len(json.dumps(answer))
+	return json.dumps({"answers": answers}), answers
+
+def chunks(text, size):
+	return [text[offset:offset + size] for offset in range(0, len(text), size)]
+
+def streamed(parts):
+	items = ArrayItems()
+	found = []
+	first = None
+	received = 0
+	start = time.process_time()
+	for part in parts:
+		received += len(part)
+		found.extend(items.feed(part))
+		if found and first is None:
+			first = (time.process_time() - start, received)
+	return found, first, time.process_time() - start
+
+def whole(parts):
+	received = 0
+	start = time.process_time()
+	buffer = []
+	for part in parts:
+		received += len(part)
+		buffer.append(part)
+	found = json.loads("".join(buffer))["answers"]
+	elapsed = time.process_time() - start
+	return found, (elapsed, received), elapsed
+
+document, expected = makeDocument()
+sample = json.dumps({"answers": expected[:200]})
+for _ in range(200):
+	offsets = sorted(random.sample(range(1, len(sample)), 50))
+	parts = [sample[start:end] for start, end in zip([0] + offsets, offsets + [len(sample)])]
+	assert streamed(parts)[0] == expected[:200], "ArrayItems disagrees with json.loads"
+
+parts = chunks(document, CHUNK)
+megabytes = len(document) / (1024 * 1024)
+print(f"{len(expected)} items, {megabytes:.1f}MB in {CHUNK} character chunks")
+print(f"  {'':<14}{'first item':>12}{'after':>10}{'CPU total':>12}{'MB/s CPU':>10}")
+for name, parse in (("json.loads", whole), ("ArrayItems", streamed)):
+	found, (firstTime, firstBytes), total = parse(parts)
+	assert found == expected
+	print(f"  {name:<14}{firstTime * 1000:>10.2f}ms{firstBytes / 1024:>8.0f}KB{total * 1000:>10.0f}ms{megabytes / total:>10.1f}")
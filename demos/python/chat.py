@@ -1,6 +1,8 @@
 from google import genai
-import os 
+from google.genai import types
+import os
 import sys
+from windowed_chat import WindowedChat
 
 class bcolors:
     HEADER = '\033[95m'
@@ -13,8 +15,17 @@ class bcolors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def envInt(name):
+	return int(os.environ[name]) if os.environ.get(name) else None
+
 client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-chat = client.chats.create(model="gemini-2.0-flash")
+chat = WindowedChat(
+	client, "gemini-2.0-flash",
+	config=types.GenerateContentConfig(system_instruction=os.environ.get("CHAT_SYSTEM_INSTRUCTION")),
+	max_turns=envInt("CHAT_MAX_TURNS"),
+	max_tokens=envInt("CHAT_MAX_TOKENS"),
+	summarize=os.environ.get("CHAT_SUMMARIZE") == "1"
+)
 
 def callGemini(str):
 	return (chat.send_message(str)).text
@@ -26,3 +37,5 @@ while prompt != "quit":
 	prompt = input(f"{bcolors.OKBLUE}Your question: ")
 	response = callGemini(prompt)
 	print(f"{bcolors.OKGREEN}Gemini says: {response}")
+
+client.close()
@@ -1,26 +1,152 @@
-import sys
+import asyncio
 import os
+import sys
+import time
+
+folder = sys.argv[1] if len(sys.argv) > 1 else '../images'
+if not os.path.isdir(folder):
+	print(f"No folder of images at {folder}.")
+	sys.exit(1)
+
+from collections import deque
+import httpx
 from google import genai
+from google.genai import types
 from slugify import slugify
+import uploads
+
+# How many images are in flight at once, and how hard we're allowed to hit the API.
+CONCURRENCY = int(os.environ.get("CONCURRENCY", 16))
+REQUESTS_PER_MINUTE = int(os.environ.get("REQUESTS_PER_MINUTE", 2000))
+TOKENS_PER_MINUTE = int(os.environ.get("TOKENS_PER_MINUTE", 4000000))
+# Starting guess for what one caption costs, an image is 258 tokens plus the prompt and answer.
+TOKENS_PER_REQUEST = int(os.environ.get("TOKENS_PER_REQUEST", 400))
+
+# One keep-alive connection per worker, reused for every upload and caption.
+# HTTP2=1 multiplexes them over a single connection instead (needs the h2 package).
+# The SDK switches async calls to aiohttp when that's installed, and aiohttp quietly drops httpx
+# settings like these. Handing it a transport keeps it on httpx, so they always apply.
+client = genai.Client(
+	api_key=os.environ["GEMINI_API_KEY"],
+	http_options=types.HttpOptions(
+		async_client_args={
+			"transport": httpx.AsyncHTTPTransport(
+				limits=httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY),
+				http2=os.environ.get("HTTP2") == "1",
+			),
+		}
+	)
+)
+
+IMAGE_TYPES = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.heic', '.heif')
 
-client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+class RateLimiter:
+	# Rolling one minute window over both requests and tokens. We don't know what a request
+	# costs until it's done, so each one reserves an estimate up front (the biggest request
+	# seen so far) and record() swaps in the real count.
+	def __init__(self, rpm, tpm, estimate):
+		self.rpm = rpm
+		self.tpm = tpm
+		self.estimate = estimate
+		self.requests = deque()
+		self.tokens = deque()
+		self.tokenTotal = 0
+		self.lock = asyncio.Lock()
 
+	def _prune(self, now):
+		while self.requests and now - self.requests[0] >= 60:
+			self.requests.popleft()
+		while self.tokens and now - self.tokens[0][0] >= 60:
+			self.tokenTotal -= self.tokens.popleft()[1]
 
-def processImage(path):
-	file_ref = client.files.upload(file=path)
+	async def acquire(self, reserve=False):
+		tokens = self.estimate if reserve else 0
+		async with self.lock:
+			while True:
+				now = time.monotonic()
+				self._prune(now)
+				fits = self.tokenTotal + tokens <= self.tpm or not self.tokens
+				if len(self.requests) < self.rpm and fits:
+					self.requests.append(now)
+					if not reserve:
+						return None
+					reservation = [now, tokens]
+					self.tokens.append(reservation)
+					self.tokenTotal += tokens
+					return reservation
+				oldest = min(
+					self.requests[0] if self.requests else now,
+					self.tokens[0][0] if self.tokens else now
+				)
+				await asyncio.sleep(max(oldest + 60 - now, 0.05))
+
+	def record(self, reservation, tokens):
+		self.estimate = max(self.estimate, tokens)
+		# Once a reservation is a minute old it has already left the window.
+		if time.monotonic() - reservation[0] < 60:
+			self.tokenTotal += tokens - reservation[1]
+			reservation[1] = tokens
+
+limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE, TOKENS_PER_REQUEST)
+
+async def processImage(path):
+	await limiter.acquire()
+	file_ref = await uploads.uploadAsync(client, path)
 	prompt = 'Describe what you see in this image in one sentence only.'
-	response = client.models.generate_content(
+	reservation = await limiter.acquire(reserve=True)
+	response = await client.aio.models.generate_content(
 		model="gemini-2.0-flash", contents=[prompt, file_ref]
 	)
+	if response.usage_metadata and response.usage_metadata.total_token_count:
+		limiter.record(reservation, response.usage_metadata.total_token_count)
 	return response.text
 
-files = os.listdir('../images')
+async def worker(queue, stats):
+	while True:
+		path = await queue.get()
+		try:
+			print(f"Looking at {path}...")
+			result = (await processImage(path)).strip()
+			# Save the description next to the image, so the next run skips it.
+			with open(sidecar(path), "w", encoding="utf-8") as file:
+				file.write(result)
+			ext = path.split('.').pop()
+			newName = f"{slugify(result)}.{ext}"
+			print(f"Will save to: {newName}")
+			stats["done"] += 1
+		except Exception as e:
+			print(f"Failed on {path}: {e}")
+			stats["failed"] += 1
+		finally:
+			queue.task_done()
+
+def sidecar(path):
+	return f"{os.path.splitext(path)[0]}.txt"
+
+async def main(folder):
+	files = [
+		os.path.join(folder, file) for file in sorted(os.listdir(folder))
+		if file.lower().endswith(IMAGE_TYPES)
+	]
+	todo = [file for file in files if not os.path.exists(sidecar(file))]
+	print(f"{len(files)} images, {len(files) - len(todo)} already described, {len(todo)} to go.")
+
+	# Bounded queue so we never hold tens of thousands of pending tasks in memory.
+	queue = asyncio.Queue(maxsize=CONCURRENCY * 2)
+	stats = {"done": 0, "failed": 0}
+	workers = [asyncio.create_task(worker(queue, stats)) for _ in range(CONCURRENCY)]
+
+	start = time.perf_counter()
+	for file in todo:
+		await queue.put(file)
+	await queue.join()
+	elapsed = time.perf_counter() - start
+
+	for w in workers:
+		w.cancel()
+	await client.aio.aclose()
 
-for file in files:
-	print(f"Looking at {file}...")	
-	
-	result = processImage(f"../images/{file}")
-	ext = file.split('.').pop()
-	newName = f"{slugify(result)}.{ext}"
-	print(f"Will save to: {newName}")
+	rate = stats["done"] / elapsed if elapsed else 0
+	print(f"Described {stats['done']} images ({stats['failed']} failed) in {elapsed:.1f}s, {rate:.2f} images/sec.")
 
+asyncio.run(main(folder))
@@ -0,0 +1,103 @@
+import base64
+import json
+import mimetypes
+import os
+import re
+
+DATA_KEY = re.compile(rb'"data"\s*:\s*"')
+EVENT_END = re.compile(rb'\r?\n\r?\n')
+
+class ImageStream:
+	# Splits an SSE response into events. Everything but the base64 image data is kept so the
+	# event can still be read as JSON (with "data" emptied out), the image data itself is
+	# decoded in 4 character steps into a file.
+	def __init__(self, name):
+		self.base = f"output/{name}"
+		self.event = b""
+		self.scan = 0
+		self.sink = None
+		self.pending = b""
+		self.images = []
+		self.count = 0
+
+	def feed(self, chunk):
+		while chunk:
+			if self.sink is not None:
+				end = chunk.find(b'"')
+				data = self.pending + (chunk if end < 0 else chunk[:end])
+				whole = len(data) - len(data) % 4
+				self.sink.write(base64.b64decode(data[:whole]))
+				self.pending = data[whole:]
+				if end < 0:
+					return
+				self.sink.close()
+				self.sink = None
+				chunk = chunk[end:]
+				continue
+
+			self.event += chunk
+			chunk = b""
+			match = DATA_KEY.search(self.event, self.scan)
+			boundary = EVENT_END.search(self.event, self.scan)
+			if boundary and (match is None or boundary.start() < match.start()):
+				self._finishEvent(self.event[:boundary.start()])
+				chunk = self.event[boundary.end():]
+				self.event = b""
+				self.scan = 0
+			elif match:
+				self.count += 1
+				if self.count == 2 and not self.images[0].endswith(".part"):
+					# The first image was saved as the only one, it gets its number after all.
+					first = self.images[0]
+					self.images[0] = f"{self.base}-1{os.path.splitext(first)[1]}"
+					os.replace(first, self.images[0])
+					print(f"renaming {first} to {self.images[0]}")
+				path = f"{self.base}.{self.count}.part"
+				self.images.append(path)
+				self.sink = open(path, "wb")
+				chunk = self.event[match.end():]
+				self.event = self.event[:match.end()]
+				self.scan = len(self.event)
+			else:
+				# Look again a little before the end in case a key or boundary is split across chunks,
+				# but never before where the last one was handled.
+				self.scan = max(self.scan, len(self.event) - 16)
+
+	def close(self):
+		if self.sink is not None:
+			self.abort()
+			raise RuntimeError(f"Stream ended in the middle of image {self.count} for {self.base}")
+		if self.event.strip():
+			self._finishEvent(self.event)
+		return self.images
+
+	def abort(self):
+		# Don't leave a half written image behind.
+		if self.sink is not None:
+			self.sink.close()
+			os.remove(self.sink.name)
+			self.sink = None
+
+	def _finishEvent(self, event):
+		event = event.strip()
+		if not event.startswith(b"data:"):
+			return
+		response = json.loads(event[len(b"data:"):])
+		if "error" in response:
+			raise RuntimeError(response["error"].get("message"))
+		for candidate in response.get("candidates", []):
+			for part in candidate.get("content", {}).get("parts", []):
+				inline = part.get("inlineData") or part.get("inline_data")
+				if inline is not None:
+					self._name(inline.get("mimeType") or inline.get("mime_type"))
+
+	def _name(self, mime_type):
+		# The mime type shows up with the image, now we know what to call the file.
+		part = next(path for path in self.images if path.endswith(".part"))
+		ext = mimetypes.guess_extension(mime_type or "") or ".png"
+		filename = f"{self.base}-{self.images.index(part) + 1}{ext}"
+		if self.count == 1:
+			filename = f"{self.base}{ext}"
+		os.replace(part, filename)
+		self.images[self.images.index(part)] = filename
+		print(f"saving {filename}")
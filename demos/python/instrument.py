@@ -0,0 +1,264 @@
+import atexit
+import contextvars
+import json
+import re
+import sys
+import threading
+import time
+import httpx
+
+# Per-request spans for everything that goes over httpx: the SDK (sync, and async unless aiohttp
+# is installed) as well as the demos that call the API directly. Nothing is patched until
+# enable() is called, so scripts that don't ask for it run exactly as before.
+#
+# Each span has these phases, in milliseconds:
+#   queue    waiting on the connection pool
+#   connect  DNS, TCP and TLS, zero when a kept-alive connection is reused
+#   send     writing the request, which is the upload for files and inline data
+#   wait     time to first byte, from the end of the request to the response headers
+#   receive  reading the body, for a streamed call that's the whole stream
+#   decode   json.loads in the SDK
+#   convert  turning that JSON into the pydantic response types
+#   total    start to finish
+# along with bytes each way, how many responses were converted (one per chunk when streaming)
+# and the token counts from usage_metadata.
+
+PHASES = ("queue", "connect", "send", "wait", "receive", "decode", "convert", "total")
+TOKENS = {
+	"prompt": "prompt_token_count",
+	"cached": "cached_content_token_count",
+	"output": "candidates_token_count",
+	"thoughts": "thoughts_token_count",
+	"total": "total_token_count",
+}
+IDS = re.compile(r"/(files|cachedContents|batches|operations|upload-session)/[^/:]+")
+
+exporters = []
+pending = set()
+lock = threading.Lock()
+current = contextvars.ContextVar("span", default=None)
+enabled = False
+
+class Span:
+	def __init__(self, request, stream):
+		path = IDS.sub(r"/\1/*", re.sub(r"/v1\w*/", "/", request.url.path))
+		self.name = f"{request.method} {path}"
+		self.started = time.time()
+		self.start = self.last = time.perf_counter()
+		self.stream = stream
+		self.marks = {}
+		self.decode = 0.0
+		self.convert = 0.0
+		self.depth = 0
+		self.response = None
+		self.bytesOut = int(request.headers.get("content-length") or 0)
+		self.chunks = 0
+		self.tokens = {}
+		self.error = None
+		self.done = False
+
+	def trace(self, event, info):
+		# httpcore trace events look like "http11.send_request_headers.started", drop the protocol.
+		self.last = self.marks[event.split(".", 1)[1]] = time.perf_counter()
+		if self.stream and event.endswith("response_closed.complete"):
+			finish(self)
+
+	async def atrace(self, event, info):
+		self.trace(event, info)
+
+	def converted(self, result, elapsed):
+		self.convert += elapsed
+		self.chunks += 1
+		self.last = time.perf_counter()
+		usage = getattr(result, "usage_metadata", None)
+		if usage is not None:
+			# Streamed chunks carry running totals, so the last one wins.
+			for key, field in TOKENS.items():
+				value = getattr(usage, field, None)
+				if value is not None:
+					self.tokens[key] = value
+		if not self.stream and self.response is not None:
+			finish(self)
+
+	def record(self):
+		marks = self.marks
+
+		def between(first, second):
+			if first in marks and second in marks:
+				return max(marks[second] - marks[first], 0.0)
+			return 0.0
+
+		first = marks.get("connect_tcp.started", marks.get("send_request_headers.started", self.start))
+		closed = "response_closed.complete" if "response_closed.complete" in marks else "receive_response_body.complete"
+		phases = {
+			"queue": first - self.start,
+			"connect": between("connect_tcp.started", "connect_tcp.complete") + between("start_tls.started", "start_tls.complete"),
+			"send": between("send_request_headers.started", "send_request_body.complete"),
+			"wait": between("send_request_body.complete", "receive_response_headers.complete"),
+			"receive": between("receive_response_headers.complete", closed),
+			"decode": self.decode,
+			"convert": self.convert,
+			"total": self.last - self.start,
+		}
+		return {
+			"name": self.name,
+			"start": self.started,
+			"status": self.response.status_code if self.response is not None else None,
+			"error": self.error,
+			"ms": {phase: round(value * 1000, 3) for phase, value in phases.items()},
+			"bytes_out": self.bytesOut,
+			"bytes_in": self.response.num_bytes_downloaded if self.response is not None else 0,
+			"chunks": self.chunks,
+			"tokens": self.tokens,
+		}
+
+def begin(request, stream, asynchronous):
+	previous = current.get()
+	if previous is not None:
+		finish(previous)
+	span = Span(request, stream)
+	request.extensions["trace"] = span.atrace if asynchronous else span.trace
+	with lock:
+		pending.add(span)
+	current.set(span)
+	return span
+
+def finish(span):
+	with lock:
+		if span.done:
+			return
+		span.done = True
+		pending.discard(span)
+		record = span.record()
+		for exporter in exporters:
+			exporter.export(record)
+
+def flush():
+	# Spans that never got a response converted (errors, uploads, deletes) go out here.
+	with lock:
+		spans = list(pending)
+	for span in spans:
+		finish(span)
+
+def failed(span, error):
+	span.error = type(error).__name__
+	span.last = time.perf_counter()
+	finish(span)
+
+def timedSend(send):
+	def wrapper(self, request, **kwargs):
+		span = begin(request, kwargs.get("stream", False), False)
+		try:
+			span.response = send(self, request, **kwargs)
+		except Exception as e:
+			failed(span, e)
+			raise
+		return span.response
+	return wrapper
+
+def timedAsyncSend(send):
+	async def wrapper(self, request, **kwargs):
+		span = begin(request, kwargs.get("stream", False), True)
+		try:
+			span.response = await send(self, request, **kwargs)
+		except Exception as e:
+			failed(span, e)
+			raise
+		return span.response
+	return wrapper
+
+class TimedJson:
+	# Stands in for the json module inside the SDK so json.loads is timed.
+	def __getattr__(self, name):
+		return getattr(json, name)
+
+	def loads(self, *args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return json.loads(*args, **kwargs)
+		finally:
+			span = current.get()
+			if span is not None and not span.done:
+				span.decode += time.perf_counter() - start
+
+def timedFromResponse(function):
+	# Response types call each other's _from_response, only the outermost call is counted.
+	def wrapper(cls, *, response, kwargs):
+		span = current.get()
+		if span is None or span.done:
+			return function(cls, response=response, kwargs=kwargs)
+		span.depth += 1
+		start = time.perf_counter()
+		try:
+			result = function(cls, response=response, kwargs=kwargs)
+		finally:
+			span.depth -= 1
+		if span.depth == 0:
+			span.converted(result, time.perf_counter() - start)
+		return result
+	return classmethod(wrapper)
+
+def enable(*new):
+	global enabled
+	exporters.extend(new)
+	if enabled:
+		return
+	enabled = True
+	httpx.Client.send = timedSend(httpx.Client.send)
+	httpx.AsyncClient.send = timedAsyncSend(httpx.AsyncClient.send)
+	try:
+		from google.genai import _common, types
+	except ImportError:
+		pass
+	else:
+		timedJson = TimedJson()
+		for name, module in list(sys.modules.items()):
+			if name.startswith("google.genai") and getattr(module, "json", None) is json:
+				module.json = timedJson
+		classes = [_common.BaseModel] + [value for value in vars(types).values() if isinstance(value, type)]
+		for cls in classes:
+			if "_from_response" in cls.__dict__:
+				cls._from_response = timedFromResponse(cls.__dict__["_from_response"].__func__)
+	atexit.register(flush)
+
+class JsonLines:
+	# One span per line, appended as each request finishes.
+	def __init__(self, path):
+		self.file = open(path, "a", encoding="utf-8", buffering=1)
+
+	def export(self, record):
+		self.file.write(json.dumps(record) + "\n")
+
+class Histogram:
+	# Keeps every timing in memory by span name, for percentiles at the end of a run.
+	def __init__(self):
+		self.samples = {}
+		self.totals = {}
+
+	def export(self, record):
+		phases = self.samples.setdefault(record["name"], {phase: [] for phase in PHASES})
+		for phase in PHASES:
+			phases[phase].append(record["ms"][phase])
+		totals = self.totals.setdefault(record["name"], {"requests": 0, "errors": 0, "bytes_out": 0, "bytes_in": 0, "chunks": 0, "tokens": {}})
+		totals["requests"] += 1
+		totals["errors"] += record["error"] is not None or (record["status"] or 0) >= 400
+		totals["bytes_out"] += record["bytes_out"]
+		totals["bytes_in"] += record["bytes_in"]
+		totals["chunks"] += record["chunks"]
+		for key, value in record["tokens"].items():
+			totals["tokens"][key] = totals["tokens"].get(key, 0) + value
+
+	def percentile(self, name, phase, p):
+		values = sorted(self.samples[name][phase])
+		return values[max(0, min(len(values) - 1, -(-len(values) * p // 100) - 1))]
+
+	def report(self, file=sys.stderr):
+		for name, totals in sorted(self.totals.items()):
+			tokens = ", ".join(f"{value} {key}" for key, value in totals["tokens"].items())
+			print(f"{name}: {totals['requests']} requests, {totals['errors']} errors, {totals['chunks']} chunks, "
+				f"{totals['bytes_out'] / 1024:.1f}KB out, {totals['bytes_in'] / 1024:.1f}KB in"
+				+ (f", tokens: {tokens}" if tokens else ""), file=file)
+			print(f"  {'ms':<8}{'p50':>10}{'p95':>10}{'p99':>10}", file=file)
+			for phase in PHASES:
+				row = "".join(f"{self.percentile(name, phase, p):>10.2f}" for p in (50, 95, 99))
+				print(f"  {phase:<8}{row}", file=file)
@@ -1,5 +1,3 @@
-from google import genai
-from google.genai import types
 import os 
 import sys
 
@@ -7,11 +5,15 @@ if len(sys.argv) == 1:
 	print("Pass a prompt argument... or else!")
 	sys.exit()
 
+from google import genai
+from google.genai import types
+import response_cache
+
 prompt = sys.argv[1]
 
 client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
 
-response = client.models.generate_content(
+response = response_cache.generateContent(client,
     model="gemini-2.0-flash", contents=prompt,
 	config=types.GenerateContentConfig(
 		response_mime_type='text/plain'
@@ -21,7 +23,7 @@ print(response.text)
 
 print('-'*80)
 
-response = client.models.generate_content(
+response = response_cache.generateContent(client,
     model="gemini-2.0-flash", contents=prompt,
 	config=types.GenerateContentConfig(
 		response_mime_type='application/json'
@@ -1,5 +1,3 @@
-from google import genai
-from google.genai import types
 import os 
 import sys
 
@@ -7,6 +5,9 @@ if len(sys.argv) == 1:
 	print("Pass a prompt argument... or else!")
 	sys.exit()
 
+from google import genai
+from google.genai import types
+
 prompt = sys.argv[1]
 
 prompt = f"""
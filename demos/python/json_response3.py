@@ -1,7 +1,14 @@
-from google import genai
-from google.genai import types
 import os 
 import sys
+
+if len(sys.argv) == 1:
+	print("Pass a prompt argument... or else!")
+	sys.exit()
+
+from google import genai
+from google.genai import types
+import json_stream
+import response_cache
 from pydantic import BaseModel
 
 class Answer(BaseModel):
@@ -11,18 +18,23 @@ class Answer(BaseModel):
 class ScientificAnswer(BaseModel):
 	answers: list[Answer]
 
-if len(sys.argv) == 1:
-	print("Pass a prompt argument... or else!")
-	sys.exit()
-
 prompt = sys.argv[1]
 
 client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-response = client.models.generate_content(
-    model="gemini-2.0-flash", contents=prompt,
-	config={
-		'response_mime_type':'application/json',
-		'response_schema': ScientificAnswer
-	}
-)
-print(response.text)
\ No newline at end of file
+config = {
+	'response_mime_type':'application/json',
+	'response_schema': ScientificAnswer
+}
+
+if os.environ.get("STREAM") == "1":
+	# Print each answer as soon as it's complete instead of waiting for the whole response.
+	chunks = client.models.generate_content_stream(
+		model="gemini-2.0-flash", contents=prompt, config=config
+	)
+	for answer in json_stream.streamItems(chunks, Answer):
+		print(answer.model_dump_json())
+else:
+	response = response_cache.generateContent(client,
+	    model="gemini-2.0-flash", contents=prompt, config=config
+	)
+	print(response.text)
@@ -0,0 +1,72 @@
+import json
+import re
+
+STRUCTURE = re.compile(r'["{}\[\]]')
+IN_STRING = re.compile(r'["\\]')
+
+class ArrayItems:
+	# Pulls finished elements out of a JSON array while the document is still arriving.
+	# depth is how many containers surround the elements: 2 for {"answers": [...]}, 1 for a bare
+	# array. Every character is scanned once, and only the finished element itself goes through
+	# json.loads, so we never re-parse the whole buffer. Elements have to be objects or arrays.
+	def __init__(self, depth=2):
+		self.depth = depth
+		self.buffer = ""
+		self.pos = 0
+		self.stack = []
+		self.inString = False
+		self.start = None
+
+	def feed(self, text):
+		buffer = self.buffer + text
+		pos = self.pos
+		items = []
+		while True:
+			if self.inString:
+				match = IN_STRING.search(buffer, pos)
+				if match is None:
+					pos = len(buffer)
+					break
+				if match.group() == "\\":
+					if match.end() == len(buffer):
+						# The escaped character is in the next chunk, look at the backslash again then.
+						pos = match.start()
+						break
+					pos = match.end() + 1
+					continue
+				self.inString = False
+				pos = match.end()
+				continue
+
+			match = STRUCTURE.search(buffer, pos)
+			if match is None:
+				pos = len(buffer)
+				break
+			char = match.group()
+			pos = match.end()
+			if char == '"':
+				self.inString = True
+			elif char in "{[":
+				if len(self.stack) == self.depth and self.stack[-1] == "[":
+					self.start = match.start()
+				self.stack.append(char)
+			else:
+				self.stack.pop()
+				if self.start is not None and len(self.stack) == self.depth:
+					items.append(json.loads(buffer[self.start:pos]))
+					self.start = None
+
+		# Only hold on to the element we're in the middle of.
+		keep = self.start if self.start is not None else pos
+		self.buffer = buffer[keep:]
+		self.pos = pos - keep
+		if self.start is not None:
+			self.start = 0
+		return items
+
+def streamItems(chunks, model, depth=2):
+	# Yields each array element of a streamed structured response as a validated model.
+	items = ArrayItems(depth)
+	for chunk in chunks:
+		for item in items.feed(chunk.text or ""):
+			yield model.model_validate(item)
@@ -1,29 +1,68 @@
-from google import genai
-from google.genai import types
 import os
 import sys
+
+if len(sys.argv) < 2:
+  print('Usage: python make_image.py "prompt" ["another prompt" ...]')
+  sys.exit(1)
+else:
+  prompts = sys.argv[1:]
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from slugify import slugify
+from image_stream import ImageStream
+try:
+	import resource
+except ImportError:
+	resource = None
 
 os.makedirs("./output", exist_ok=True)
 
-client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+# We talk to the streaming endpoint directly here, so image bytes are base64 decoded straight
+# into the output file as they arrive instead of sitting in memory as JSON, a str and bytes.
+MODEL = "models/gemini-2.0-flash-exp"
+API_KEY = os.environ["GEMINI_API_KEY"]
+BASE_URL = os.environ.get("GOOGLE_GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+CONCURRENCY = int(os.environ.get("CONCURRENCY", 4))
 
-if len(sys.argv) < 2:
-  print('Usage: python make_image.py "prompt"')
-  sys.exit(1)
-else:
-  prompt = sys.argv[1]
-
-response = client.models.generate_content(
-	model="models/gemini-2.0-flash-exp",
-	contents=prompt,
-	config=types.GenerateContentConfig(response_modalities=['Text', 'Image'])
-)
-
-for part in response.candidates[0].content.parts:
-	if part.inline_data is not None:
-		filename = f"output/{slugify(prompt)}.png"
-		print(f"saving {filename}")
-		with open(filename, "wb") as file:
-			file.write(part.inline_data.data)
-		
+client = httpx.Client(timeout=httpx.Timeout(300, connect=10), limits=httpx.Limits(max_connections=CONCURRENCY))
+
+# Prompts that slugify the same get their position added (slugs never contain "_"), so two
+# tasks never write the same file.
+slugs = [slugify(prompt) for prompt in prompts]
+names = [slug if slugs.count(slug) == 1 else f"{slug}_{index + 1}" for index, slug in enumerate(slugs)]
+
+def makeImage(index):
+	prompt = prompts[index]
+	stream = ImageStream(names[index])
+	body = {
+		"contents": [{"role": "user", "parts": [{"text": prompt}]}],
+		"generationConfig": {"responseModalities": ["TEXT", "IMAGE"]},
+	}
+	with client.stream(
+		"POST", f"{BASE_URL}/v1beta/{MODEL}:streamGenerateContent?alt=sse",
+		headers={"x-goog-api-key": API_KEY}, json=body
+	) as response:
+		if response.status_code != 200:
+			response.read()
+			raise RuntimeError(f"{response.status_code}: {response.text}")
+		try:
+			for chunk in response.iter_bytes():
+				stream.feed(chunk)
+		except BaseException:
+			stream.abort()
+			raise
+	return stream.close()
+
+start = time.perf_counter()
+with ThreadPoolExecutor(CONCURRENCY) as pool:
+	images = sum((len(saved) for saved in pool.map(makeImage, range(len(prompts)))), 0)
+elapsed = time.perf_counter() - start
+
+if len(prompts) > 1:
+	print(f"Made {images} images in {elapsed:.1f}s, {images / elapsed:.2f} images/sec.")
+	if resource is not None:
+		# ru_maxrss is in KB on Linux and in bytes on macOS.
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+		print(f"Peak RSS {peak // (1024 * 1024 if sys.platform == 'darwin' else 1024)}MB.")
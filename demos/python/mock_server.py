@@ -0,0 +1,197 @@
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A fake Gemini API with a fixed model latency, for benchmarking the demos without a network
+# or an API key. Unlike replay_server.py it needs no recording, every answer is made up.
+#
+#   python mock_server.py
+#
+# then point the demos at it with GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:8900. It handles
+# resumable uploads, generateContent and streamGenerateContent (with images when asked for
+# IMAGE output), countTokens, context caches and batch jobs.
+
+PORT = int(os.environ.get("MOCK_PORT", 8900))
+# How long a model call takes, in seconds.
+DELAY = float(os.environ.get("MOCK_DELAY", 0.05))
+# Size of the generated image, filled with bytes(range(256)) so callers can check what they saved.
+IMAGE_BYTES = int(os.environ.get("MOCK_IMAGE_BYTES", 4 * 1024 * 1024))
+ANSWER = "A fluffy cat sitting on a sunny windowsill."
+SEND_SLICE = 64 * 1024
+
+image = None
+files = {}
+uploads = {}
+batches = {}
+lock = threading.Lock()
+
+def imageData():
+	global image
+	if image is None:
+		image = base64.b64encode((bytes(range(256)) * (IMAGE_BYTES // 256 + 1))[:IMAGE_BYTES]).decode("ascii")
+	return image
+
+def expires(seconds):
+	return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + seconds))
+
+def answer(request, body):
+	config = request.get("generationConfig", {})
+	text = ANSWER
+	if config.get("responseMimeType") == "application/json":
+		text = json.dumps({"answers": [{"answer": f"Answer {i}", "referenceURL": f"https://example.com/{i}"} for i in range(5)]})
+	parts = [{"text": text}]
+	if "IMAGE" in [modality.upper() for modality in config.get("responseModalities", [])]:
+		parts = [{"text": "Here is your image."}, {"inlineData": {"mimeType": "image/png", "data": imageData()}}]
+	prompt = len(body) // 4
+	usage = {"promptTokenCount": prompt, "candidatesTokenCount": len(text) // 4, "totalTokenCount": prompt + len(text) // 4}
+	if request.get("cachedContent"):
+		usage["cachedContentTokenCount"] = prompt
+	return {"candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP"}], "usageMetadata": usage}
+
+class MockHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	# Headers and body in one write, otherwise keep-alive clients wait on delayed ACKs.
+	wbufsize = 64 * 1024
+
+	def log_message(self, format, *args):
+		pass
+
+	def _send(self, status, body, headers=None, content_type="application/json"):
+		data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(data)))
+		for name, value in (headers or {}).items():
+			self.send_header(name, value)
+		self.end_headers()
+		for offset in range(0, len(data), SEND_SLICE):
+			self.wfile.write(data[offset:offset + SEND_SLICE])
+
+	def _error(self, status, message):
+		self._send(status, {"error": {"code": status, "message": message, "status": "NOT_FOUND" if status == 404 else "INVALID_ARGUMENT"}})
+
+	def _body(self):
+		return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+	def _name(self):
+		return self.path.split("/v1beta/", 1)[-1].split("?")[0]
+
+	def do_GET(self):
+		name = self._name()
+		if name.endswith(":download"):
+			return self._send(200, bytes(files[name[:-len(":download")]]["data"]), content_type="application/octet-stream")
+		if name in files:
+			return self._send(200, files[name]["file"])
+		if name == "batches":
+			return self._send(200, {"operations": [batch["operation"] for batch in reversed(list(batches.values()))]})
+		if name in batches:
+			batch = batches[name]
+			batch["polls"] += 1
+			if batch["polls"] > 1:
+				batch["operation"]["metadata"]["state"] = "BATCH_STATE_SUCCEEDED"
+				batch["operation"]["metadata"]["output"] = {"responsesFile": batch["output"]}
+			return self._send(200, batch["operation"])
+		self._error(404, f"No {name}")
+
+	def do_DELETE(self):
+		self._body()
+		self._send(200, {})
+
+	def do_PATCH(self):
+		self._body()
+		self._send(200, {"name": self._name(), "expireTime": expires(3600)})
+
+	def do_POST(self):
+		body = self._body()
+		command = self.headers.get("X-Goog-Upload-Command", "")
+		if self.path.startswith("/upload/") and "start" in command:
+			return self._startUpload()
+		if self.path.startswith("/upload-session/"):
+			return self._upload(command, body)
+
+		name = self._name()
+		request = json.loads(body) if body else {}
+		if name.endswith(":countTokens"):
+			return self._send(200, {"totalTokens": len(body) // 4})
+		if name.endswith(":generateContent"):
+			time.sleep(DELAY)
+			return self._send(200, answer(request, body))
+		if name.endswith(":streamGenerateContent"):
+			time.sleep(DELAY)
+			return self._stream(answer(request, body))
+		if name == "cachedContents":
+			time.sleep(DELAY)
+			return self._send(200, {"name": f"cachedContents/{uuid.uuid4().hex[:12]}", "model": request.get("model"), "expireTime": expires(3600)})
+		if name.endswith(":batchGenerateContent"):
+			return self._batch(request)
+		self._error(404, f"No {name}")
+
+	def _stream(self, response):
+		# Text is split over a few events, an image goes out as one big event the way the API does.
+		parts = response["candidates"][0]["content"]["parts"]
+		events = [response]
+		if len(parts) == 1:
+			text = parts[0]["text"]
+			step = max(1, len(text) // 4)
+			events = []
+			for offset in range(0, len(text), step):
+				event = json.loads(json.dumps(response))
+				event["candidates"][0]["content"]["parts"][0]["text"] = text[offset:offset + step]
+				events.append(event)
+		data = b"".join(b"data: " + json.dumps(event).encode("utf-8") + b"\r\n\r\n" for event in events)
+		self._send(200, data, content_type="text/event-stream")
+
+	def _startUpload(self):
+		session = uuid.uuid4().hex
+		uploads[session] = {"mime_type": self.headers.get("X-Goog-Upload-Header-Content-Type", "application/octet-stream"), "data": bytearray()}
+		url = f"http://{self.headers['Host']}/upload-session/{session}"
+		self._send(200, {}, {"X-Goog-Upload-URL": url, "X-Goog-Upload-Status": "active"})
+
+	def _upload(self, command, body):
+		session = self.path.rsplit("/", 1)[-1]
+		upload = uploads.get(session)
+		if upload is None:
+			return self._error(404, "Unknown upload session")
+		if "query" in command:
+			return self._send(200, {}, {"X-Goog-Upload-Status": "active", "X-Goog-Upload-Size-Received": str(len(upload["data"]))})
+		upload["data"] += body
+		if "finalize" not in command:
+			return self._send(200, {}, {"X-Goog-Upload-Status": "active"})
+		name = f"files/{session[:12]}"
+		file = {
+			"name": name,
+			"uri": f"http://{self.headers['Host']}/v1beta/{name}",
+			"mimeType": upload["mime_type"],
+			"sizeBytes": str(len(upload["data"])),
+			"expirationTime": expires(48 * 3600),
+			"state": "ACTIVE",
+		}
+		files[name] = {"file": file, "data": uploads.pop(session)["data"]}
+		self._send(200, {"file": file}, {"X-Goog-Upload-Status": "final"})
+
+	def _batch(self, request):
+		lines = bytes(files[request["batch"]["inputConfig"]["fileName"]]["data"]).decode("utf-8").splitlines()
+		results = []
+		for line in lines:
+			row = json.loads(line)
+			results.append(json.dumps({"key": row["key"], "response": answer(row["request"], line.encode("utf-8"))}))
+		with lock:
+			name = f"batches/{uuid.uuid4().hex[:12]}"
+			output = f"files/{name[len('batches/'):]}-output"
+			files[output] = {"file": {"name": output}, "data": "\n".join(results).encode("utf-8")}
+			operation = {"name": name, "metadata": {"displayName": request["batch"].get("displayName"), "state": "BATCH_STATE_PENDING"}}
+			batches[name] = {"operation": operation, "output": output, "polls": 0}
+		self._send(200, operation)
+
+class MockServer(ThreadingHTTPServer):
+	daemon_threads = True
+	# The socketserver default backlog of 5 resets connections under any real load.
+	request_queue_size = 1024
+
+server = MockServer(("127.0.0.1", PORT), MockHandler)
+print(f"Mock Gemini API on http://127.0.0.1:{PORT}, {DELAY * 1000:.0f}ms per model call", flush=True)
+server.serve_forever()
@@ -1,23 +1,152 @@
 import sys
 import os
+import json
+import time
+
+if len(sys.argv) == 1:
+	print("Pass a path to the PDF, and optionally questions to ask about it.")
+	sys.exit()
+
 from google import genai
+from google.genai import errors
+from google.genai import types
+import uploads
 
 client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
 
+# Q&A mode keeps each document in a context cache so follow up questions don't resend it.
+# Context caching needs a pinned model version.
+QA_MODEL = "gemini-2.0-flash-001"
+CACHE_INDEX = os.environ.get("CONTEXT_CACHE_INDEX", ".context_caches.json")
+CACHE_TTL = int(os.environ.get("CONTEXT_CACHE_TTL", 3600))
+MAX_CACHES = int(os.environ.get("CONTEXT_CACHE_MAX", 10))
+
+def showProgress(sent, total):
+	print(f"Uploaded {sent * 100 // total}%", end="\r", file=sys.stderr)
 
 def processDoc(path):
-	file_ref = client.files.upload(file=path)
+	file_ref = uploads.upload(client, path, progress=showProgress)
 	prompt = 'Write a one paragraph summary of this document, followed by three to four bullet points'
 	response = client.models.generate_content(
 		model="gemini-2.0-flash", contents=[prompt, file_ref]
 	)
 	return response.text
 
-if len(sys.argv) == 1:
-	print("Pass a path to the PDF.")
-	sys.exit()
+class ContextCaches:
+	# Local registry of file hash -> cached content, least recently used evicted first.
+	def __init__(self, path):
+		self.path = path
+		self.entries = {}
+		if os.path.exists(path):
+			with open(path, encoding="utf-8") as file:
+				self.entries = json.load(file)
+		now = time.time()
+		self.entries = {key: entry for key, entry in self.entries.items() if entry["expires"] > now}
+
+	def save(self):
+		with open(self.path, "w", encoding="utf-8") as file:
+			json.dump(self.entries, file, indent=2)
+
+	def get(self, key):
+		entry = self.entries.get(key)
+		if entry is None or entry["expires"] <= time.time():
+			return None
+		# Push the expiry back once we're past half of the TTL, so busy documents stay cached.
+		if entry["expires"] - time.time() < CACHE_TTL / 2:
+			try:
+				cache = client.caches.update(
+					name=entry["name"], config=types.UpdateCachedContentConfig(ttl=f"{CACHE_TTL}s")
+				)
+			except errors.ClientError as e:
+				if e.code not in (403, 404):
+					raise
+				# Gone server side already, treat it as a miss.
+				self.drop(key)
+				return None
+			entry["expires"] = cache.expire_time.timestamp()
+		entry["used"] = time.time()
+		self.save()
+		return entry
+
+	def put(self, key, cache, baseline):
+		self.entries[key] = {
+			"name": cache.name,
+			"expires": cache.expire_time.timestamp(),
+			"used": time.time(),
+			"baseline": baseline,
+		}
+		while len(self.entries) > MAX_CACHES:
+			oldest = min(self.entries, key=lambda k: self.entries[k]["used"])
+			try:
+				client.caches.delete(name=self.entries[oldest]["name"])
+			except errors.ClientError:
+				pass
+			del self.entries[oldest]
+		self.save()
+
+	def drop(self, key):
+		self.entries.pop(key, None)
+		self.save()
+
+registry = ContextCaches(CACHE_INDEX)
+
+def askDoc(path, key, question):
+	entry = registry.get(key)
+
+	if entry is None:
+		# First question about this document: answer it the normal way, which also gives us the
+		# baseline to compare cached questions against, then cache the document for next time.
+		file_ref = uploads.upload(client, path, progress=showProgress)
+		start = time.perf_counter()
+		response = client.models.generate_content(model=QA_MODEL, contents=[question, file_ref])
+		baseline = {
+			"latency": time.perf_counter() - start,
+			"tokens": response.usage_metadata.prompt_token_count,
+		}
+		try:
+			cache = client.caches.create(
+				model=QA_MODEL,
+				config=types.CreateCachedContentConfig(
+					display_name=os.path.basename(path), contents=[file_ref], ttl=f"{CACHE_TTL}s"
+				)
+			)
+		except errors.ClientError as e:
+			# Usually a document under the model's minimum size for caching, still answer the question.
+			print(f"[uncached: {baseline['tokens']} input tokens in {baseline['latency']:.2f}s, could not cache the document: {e.message}]")
+			return response.text
+		registry.put(key, cache, baseline)
+		print(f"[uncached: {baseline['tokens']} input tokens in {baseline['latency']:.2f}s, document is now cached]")
+		return response.text
+
+	start = time.perf_counter()
+	try:
+		response = client.models.generate_content(
+			model=QA_MODEL, contents=question,
+			config=types.GenerateContentConfig(cached_content=entry["name"])
+		)
+	except errors.ClientError as e:
+		if e.code not in (403, 404):
+			raise
+		# The cache went away server side, start over with this document.
+		registry.drop(key)
+		return askDoc(path, key, question)
+
+	latency = time.perf_counter() - start
+	usage = response.usage_metadata
+	cached = usage.cached_content_token_count or 0
+	baseline = entry["baseline"]
+	print(f"[cached: {cached} of {usage.prompt_token_count} input tokens from cache, "
+		f"{latency:.2f}s vs {baseline['latency']:.2f}s uncached, saved {baseline['latency'] - latency:.2f}s]")
+	return response.text
 
 file = sys.argv[1]
+questions = sys.argv[2:]
 
-results = processDoc(file)
-print(results)
+if not questions:
+	results = processDoc(file)
+	print(results)
+else:
+	key = f"{QA_MODEL}:{uploads.fileHash(file)}"
+	for question in questions:
+		print(f"Q: {question}")
+		print(askDoc(file, key, question))
@@ -0,0 +1,59 @@
+import os
+import runpy
+import sys
+import time
+import traceback
+
+# Runs one of the demos with instrument.py hooked in and prints p50/p95/p99 for each phase of
+# every kind of request it made.
+#
+#   python profile_demo.py [--repeat N] [--jsonl spans.jsonl] pdf.py some.pdf "a question"
+
+USAGE = "Usage: python profile_demo.py [--repeat N] [--jsonl spans.jsonl] script.py [args...]"
+
+args = sys.argv[1:]
+repeat = 1
+jsonl = None
+while args and args[0].startswith("--"):
+	option = args.pop(0)
+	if option == "--repeat" and args:
+		repeat = int(args.pop(0))
+	elif option == "--jsonl" and args:
+		jsonl = args.pop(0)
+	else:
+		args = []
+
+if not args:
+	print(USAGE)
+	sys.exit(1)
+
+import instrument
+
+histogram = instrument.Histogram()
+instrument.enable(histogram, *([instrument.JsonLines(jsonl)] if jsonl else []))
+
+script = args[0]
+sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+runs = []
+for run in range(repeat):
+	sys.argv = list(args)
+	start = time.perf_counter()
+	try:
+		runpy.run_path(script, run_name="__main__")
+	except SystemExit as e:
+		if e.code not in (None, 0):
+			print(f"{script} exited with {e.code} on run {run + 1}", file=sys.stderr)
+			break
+	except Exception:
+		# Still report on whatever requests were made before it failed.
+		traceback.print_exc()
+		break
+	runs.append(time.perf_counter() - start)
+	instrument.flush()
+
+instrument.flush()
+print(file=sys.stderr)
+histogram.report()
+if runs:
+	runs.sort()
+	print(f"{len(runs)} runs of {script}, median {runs[len(runs) // 2]:.2f}s, slowest {runs[-1]:.2f}s", file=sys.stderr)
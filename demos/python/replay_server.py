@@ -0,0 +1,196 @@
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import httpx
+
+# A local stand-in for the Gemini API, so the demos can be load tested without a network.
+#
+#   python replay_server.py record store.jsonl    proxy to the real API and save what comes back
+#   python replay_server.py play store.jsonl      answer from the recording
+#
+# then point the demos at it with GOOGLE_GEMINI_BASE_URL=http://localhost:8800.
+#
+# The store is JSONL with one response per line and the request key first, so loading it is a
+# pass over the keys into an index of byte offsets. Responses stay in the memory map until asked
+# for. Lookups go by a hash of the redacted request, not by order, so any number of threads or
+# asyncio tasks can replay at once.
+
+UPSTREAM = os.environ.get("REPLAY_UPSTREAM", "https://generativelanguage.googleapis.com")
+PORT = int(os.environ.get("REPLAY_PORT", 8800))
+KEY_PREFIX = b'{"key": "'
+
+def redact(value):
+	# Uploaded file URIs differ between runs, so every file reference matches any other.
+	if isinstance(value, dict):
+		return {key: "<file>" if key in ("fileUri", "file_uri") else redact(item) for key, item in value.items()}
+	if isinstance(value, list):
+		return [redact(item) for item in value]
+	return value
+
+def requestKey(method, path, body):
+	url = urlsplit(path)
+	query = urlencode(sorted((name, value) for name, value in parse_qsl(url.query) if name != "key"))
+	try:
+		body = json.dumps(redact(json.loads(body)), sort_keys=True, separators=(",", ":")).encode("utf-8") if body else b""
+	except ValueError:
+		pass
+	digest = hashlib.sha256(f"{method} {url.path}?{query}\n".encode("utf-8"))
+	digest.update(body)
+	return digest.hexdigest()
+
+class ReplayStore:
+	def __init__(self, path):
+		self.path = path
+		self.index = {}
+		self.turns = {}
+		self.lock = threading.Lock()
+		self.mapped = None
+		if os.path.exists(path) and os.path.getsize(path):
+			with open(path, "rb") as file:
+				self.mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+			offset = 0
+			for line in iter(self.mapped.readline, b""):
+				if line.strip():
+					if line.startswith(KEY_PREFIX):
+						key = line[len(KEY_PREFIX):len(KEY_PREFIX) + 64].decode("ascii")
+					else:
+						key = json.loads(line)["key"]
+					self.index.setdefault(key, []).append((offset, offset + len(line)))
+				offset += len(line)
+
+	def get(self, key):
+		spots = self.index.get(key)
+		if not spots:
+			return None
+		# Several recordings of the same request are handed out in turn.
+		with self.lock:
+			if key not in self.turns:
+				self.turns[key] = itertools.cycle(spots)
+			start, end = next(self.turns[key])
+		return json.loads(self.mapped[start:end])
+
+	def add(self, key, status, content_type, body):
+		line = json.dumps({"key": key, "status": status, "content_type": content_type, "body": body}) + "\n"
+		with self.lock:
+			with open(self.path, "a", encoding="utf-8") as file:
+				file.write(line)
+
+class ReplayHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	# Headers and body in one write, otherwise keep-alive clients wait on delayed ACKs.
+	wbufsize = 64 * 1024
+	store = None
+	recording = False
+	uploads = {}
+	client = None
+
+	def log_message(self, format, *args):
+		pass
+
+	def _send(self, status, content_type, body, headers=None):
+		data = body if isinstance(body, bytes) else body.encode("utf-8")
+		self.send_response(status)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(data)))
+		for name, value in (headers or {}).items():
+			self.send_header(name, value)
+		self.end_headers()
+		self.wfile.write(data)
+
+	def _error(self, status, message):
+		body = json.dumps({"error": {"code": status, "message": message, "status": "NOT_FOUND"}})
+		self._send(status, "application/json", body)
+
+	def _body(self):
+		return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+	def do_GET(self):
+		self._handle(b"")
+
+	def do_DELETE(self):
+		self._handle(b"")
+
+	def do_PATCH(self):
+		self._handle(self._body())
+
+	def do_POST(self):
+		body = self._body()
+		if not self.recording and (self.path.startswith("/upload/") or self.path.startswith("/upload-session/")):
+			return self._upload(body)
+		self._handle(body)
+
+	def _handle(self, body):
+		key = requestKey(self.command, self.path, body)
+		if self.recording:
+			headers = {name: value for name, value in self.headers.items() if name.lower() not in ("host", "content-length")}
+			response = self.client.request(self.command, UPSTREAM + self.path, headers=headers, content=body)
+			content_type = response.headers.get("content-type", "application/json")
+			extra = {name: value for name, value in response.headers.items() if name.lower().startswith("x-goog-upload")}
+			if response.status_code < 500 and not extra:
+				self.store.add(key, response.status_code, content_type, response.text)
+			return self._send(response.status_code, content_type, response.content, extra)
+
+		recorded = self.store.get(key)
+		if recorded is None:
+			return self._error(404, f"No recording for {self.command} {urlsplit(self.path).path}")
+		self._send(recorded["status"], recorded["content_type"], recorded["body"])
+
+	def _upload(self, body):
+		# Uploads are answered locally on playback, so file demos work with nothing recorded.
+		command = self.headers.get("X-Goog-Upload-Command", "")
+		if "start" in command:
+			session = uuid.uuid4().hex
+			self.uploads[session] = {
+				"mime_type": self.headers.get("X-Goog-Upload-Header-Content-Type", "application/octet-stream"),
+				"digest": hashlib.sha256(),
+				"size": 0,
+			}
+			url = f"http://{self.headers['Host']}/upload-session/{session}"
+			return self._send(200, "application/json", "{}", {"X-Goog-Upload-URL": url, "X-Goog-Upload-Status": "active"})
+
+		upload = self.uploads.get(self.path.rsplit("/", 1)[-1])
+		if upload is None:
+			return self._error(404, "Unknown upload session")
+		if "query" in command:
+			return self._send(200, "application/json", "{}", {"X-Goog-Upload-Status": "active", "X-Goog-Upload-Size-Received": str(upload["size"])})
+		upload["digest"].update(body)
+		upload["size"] += len(body)
+		if "finalize" not in command:
+			return self._send(200, "application/json", "{}", {"X-Goog-Upload-Status": "active"})
+
+		name = f"files/{upload['digest'].hexdigest()[:16]}"
+		file = {
+			"name": name,
+			"uri": f"http://{self.headers['Host']}/v1beta/{name}",
+			"mimeType": upload["mime_type"],
+			"sizeBytes": str(upload["size"]),
+			"expirationTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + 48 * 3600)),
+			"state": "ACTIVE",
+		}
+		self._send(200, "application/json", json.dumps({"file": file}), {"X-Goog-Upload-Status": "final"})
+
+class ReplayServer(ThreadingHTTPServer):
+	daemon_threads = True
+	# The socketserver default backlog of 5 resets connections under any real load.
+	request_queue_size = 1024
+
+if len(sys.argv) < 3 or sys.argv[1] not in ("record", "play"):
+	print("Usage: python replay_server.py record|play <store.jsonl>")
+	sys.exit(1)
+
+ReplayHandler.recording = sys.argv[1] == "record"
+ReplayHandler.store = ReplayStore(sys.argv[2])
+if ReplayHandler.recording:
+	ReplayHandler.client = httpx.Client(timeout=300)
+
+server = ReplayServer(("127.0.0.1", PORT), ReplayHandler)
+print(f"{sys.argv[1].capitalize()}ing {sys.argv[2]} ({len(ReplayHandler.store.index)} requests indexed) on http://127.0.0.1:{PORT}")
+server.serve_forever()
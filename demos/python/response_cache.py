@@ -0,0 +1,134 @@
+import atexit
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+import pydantic
+from google.genai import types
+
+# Set RESPONSE_CACHE to a folder to answer repeated identical requests locally. Only requests
+# that set temperature to 0 are cached, anything else samples at the model's default and could
+# answer differently next time. RESPONSE_CACHE_ANY_TEMPERATURE=1 caches those as well.
+CACHE_DIR = os.environ.get("RESPONSE_CACHE")
+ANY_TEMPERATURE = os.environ.get("RESPONSE_CACHE_ANY_TEMPERATURE") == "1"
+TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 24 * 3600))
+MEMORY_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MEMORY_ENTRIES", 256))
+MEMORY_BYTES = int(os.environ.get("RESPONSE_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))
+DISK_BYTES = int(os.environ.get("RESPONSE_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+
+def canonical(value):
+	# Plain JSON for anything we might get as a request field, with nothing that varies per run.
+	if isinstance(value, type) and issubclass(value, pydantic.BaseModel):
+		return value.model_json_schema()
+	if isinstance(value, pydantic.BaseModel):
+		return canonical(value.model_dump(mode="json", exclude_none=True))
+	if isinstance(value, dict):
+		return {key: canonical(item) for key, item in value.items() if item is not None and key != "http_options"}
+	if isinstance(value, (list, tuple)):
+		return [canonical(item) for item in value]
+	if isinstance(value, bytes):
+		return hashlib.sha256(value).hexdigest()
+	return value
+
+def requestKey(model, contents, config):
+	body = json.dumps(canonical({"model": model, "contents": contents, "config": config}), sort_keys=True, separators=(",", ":"))
+	return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def cacheable(config):
+	if ANY_TEMPERATURE:
+		return True
+	if config is None:
+		return False
+	temperature = config.get("temperature") if isinstance(config, dict) else config.temperature
+	return temperature == 0
+
+class ResponseCache:
+	def __init__(self, folder):
+		self.folder = folder
+		os.makedirs(folder, exist_ok=True)
+		self.memory = OrderedDict()
+		self.memoryBytes = 0
+		self.diskBytes = None
+		self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bytes_read": 0, "bytes_written": 0}
+
+	def _remember(self, key, data, expires):
+		if key in self.memory:
+			self.memoryBytes -= len(self.memory.pop(key)[1])
+		self.memory[key] = (expires, data)
+		self.memoryBytes += len(data)
+		while len(self.memory) > MEMORY_ENTRIES or self.memoryBytes > MEMORY_BYTES:
+			self.memoryBytes -= len(self.memory.popitem(last=False)[1][1])
+
+	def get(self, key):
+		entry = self.memory.get(key)
+		if entry and entry[0] > time.time():
+			self.memory.move_to_end(key)
+			self.stats["memory_hits"] += 1
+			return types.GenerateContentResponse.model_validate_json(entry[1])
+
+		path = os.path.join(self.folder, f"{key}.json")
+		try:
+			expires = os.path.getmtime(path) + TTL
+			if expires > time.time():
+				with open(path, "rb") as file:
+					data = file.read()
+				self.stats["disk_hits"] += 1
+				self.stats["bytes_read"] += len(data)
+				# Keep the disk entry's expiry, so memory never serves it for longer.
+				self._remember(key, data, expires)
+				return types.GenerateContentResponse.model_validate_json(data)
+			os.remove(path)
+		except FileNotFoundError:
+			pass
+		self.stats["misses"] += 1
+		return None
+
+	def put(self, key, response):
+		data = response.model_dump_json(exclude_none=True, exclude={"sdk_http_response"}).encode("utf-8")
+		self._remember(key, data, time.time() + TTL)
+		path = os.path.join(self.folder, f"{key}.json")
+		tmp = f"{path}.tmp"
+		with open(tmp, "wb") as file:
+			file.write(data)
+		os.replace(tmp, path)
+		self.stats["bytes_written"] += len(data)
+		if self.diskBytes is not None:
+			self.diskBytes += len(data)
+		if self.diskBytes is None or self.diskBytes > DISK_BYTES:
+			self._trimDisk()
+
+	def _trimDisk(self):
+		# Oldest and expired entries go first, until the folder is back under DISK_BYTES.
+		entries = []
+		total = 0
+		with os.scandir(self.folder) as scan:
+			for entry in scan:
+				if entry.name.endswith(".json"):
+					stat = entry.stat()
+					entries.append((stat.st_mtime, stat.st_size, entry.path))
+					total += stat.st_size
+		now = time.time()
+		for mtime, size, path in sorted(entries):
+			if total <= DISK_BYTES and mtime + TTL > now:
+				break
+			os.remove(path)
+			total -= size
+		self.diskBytes = total
+
+cache = ResponseCache(CACHE_DIR) if CACHE_DIR else None
+
+if cache and os.environ.get("RESPONSE_CACHE_STATS") == "1":
+	atexit.register(lambda: print(f"Response cache: {cache.stats}", file=sys.stderr))
+
+def generateContent(client, model, contents, config=None):
+	if cache is None or not cacheable(config):
+		return client.models.generate_content(model=model, contents=contents, config=config)
+	key = requestKey(model, contents, config)
+	response = cache.get(key)
+	if response is None:
+		response = client.models.generate_content(model=model, contents=contents, config=config)
+		if response.candidates:
+			cache.put(key, response)
+	return response
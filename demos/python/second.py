@@ -1,4 +1,3 @@
-from google import genai
 import os 
 import sys
 
@@ -6,6 +5,8 @@ if len(sys.argv) == 1:
 	print("Pass a prompt argument... or else!")
 	sys.exit()
 
+from google import genai
+
 prompt = sys.argv[1]
 
 client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
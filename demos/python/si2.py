@@ -1,5 +1,3 @@
-from google import genai
-from google.genai import types
 import os 
 import sys
 
@@ -7,6 +5,10 @@ if len(sys.argv) == 1:
 	print("Pass a prompt argument... or else!")
 	sys.exit()
 
+from google import genai
+from google.genai import types
+import response_cache
+
 prompt = sys.argv[1]
 
 si = """
@@ -14,7 +16,7 @@ You are a bot focused on astronomy topics, and only astronomy. Tailor your answe
 """
 
 client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-response = client.models.generate_content(
+response = response_cache.generateContent(client,
     model="gemini-2.0-flash", contents=prompt,
 	config=types.GenerateContentConfig(
 		system_instruction=si
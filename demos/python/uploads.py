@@ -0,0 +1,234 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import httpx
+from google.genai import types
+
+# Set UPLOAD_CACHE to a JSON file (e.g. UPLOAD_CACHE=.uploads.json) to skip re-uploading
+# bytes the Files API already has. Entries are keyed by a SHA-256 of the file content plus the
+# backend it was uploaded to (BACKEND below).
+CACHE_PATH = os.environ.get("UPLOAD_CACHE")
+
+# Files API uploads expire server-side (48 hours), stop trusting ours a bit before that.
+EXPIRY_MARGIN = 15 * 60
+HASH_SLICE = 8 * 1024 * 1024
+# The index is rewritten every SAVE_EVERY new uploads and at exit, not once per upload.
+SAVE_EVERY = 100
+
+# Anything bigger than this goes through uploadResumable below instead of files.upload.
+LARGE_FILE = 32 * 1024 * 1024
+API_KEY = os.environ.get("GEMINI_API_KEY")
+BASE_URL = os.environ.get("GOOGLE_GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+
+# Resumable uploads have to land in offset order, so rather than racing chunks in parallel
+# we keep one pooled connection busy and have the kernel page in the next chunk meanwhile.
+# Non-final chunks must be multiples of 256KB.
+CHUNK_ALIGN = 256 * 1024
+FIRST_CHUNK = 8 * 1024 * 1024
+MAX_CHUNK = 128 * 1024 * 1024
+CHUNK_SECONDS = 2
+SEND_SLICE = 1024 * 1024
+RETRIES = 5
+
+# A file reference only works against the endpoint and project (API key) that uploaded it, so
+# cache entries are keyed by those as well as by the content. The demos build their clients
+# from the same two environment variables.
+BACKEND = hashlib.sha256(f"{BASE_URL}\n{API_KEY}".encode("utf-8")).hexdigest()[:16]
+
+def fileHash(path):
+	# Hash through a memory map so big PDFs never have to sit in RAM all at once.
+	digest = hashlib.sha256()
+	with open(path, "rb") as file:
+		if os.fstat(file.fileno()).st_size == 0:
+			return digest.hexdigest()
+		with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+			view = memoryview(mapped)
+			try:
+				for offset in range(0, len(view), HASH_SLICE):
+					digest.update(view[offset:offset + HASH_SLICE])
+			finally:
+				view.release()
+	return digest.hexdigest()
+
+class UploadCache:
+	def __init__(self, path):
+		self.path = path
+		self.entries = {}
+		self.unsaved = 0
+		# batch.py uploads from a thread pool, so every touch of entries goes through this.
+		self.lock = threading.Lock()
+		if os.path.exists(path):
+			with open(path, encoding="utf-8") as file:
+				self.entries = json.load(file)
+		self._evict()
+
+	def _evict(self):
+		now = time.time()
+		self.entries = {
+			key: entry for key, entry in self.entries.items() if entry["expires"] > now
+		}
+
+	def save(self):
+		with self.lock:
+			if not self.unsaved:
+				return
+			self.unsaved = 0
+			self._evict()
+			tmp = f"{self.path}.tmp"
+			with open(tmp, "w", encoding="utf-8") as file:
+				json.dump(self.entries, file)
+			os.replace(tmp, self.path)
+
+	def get(self, key, lifetime=0):
+		# lifetime is how much longer the caller needs the file to stay around.
+		with self.lock:
+			entry = self.entries.get(key)
+		if entry is None or entry["expires"] - lifetime <= time.time():
+			return None
+		return types.File.model_validate(entry["file"])
+
+	def put(self, key, file_ref):
+		if file_ref.expiration_time is None:
+			return
+		entry = {
+			"file": file_ref.model_dump(mode="json", exclude_none=True),
+			"expires": file_ref.expiration_time.timestamp() - EXPIRY_MARGIN,
+		}
+		with self.lock:
+			self.entries[key] = entry
+			self.unsaved += 1
+			full = self.unsaved >= SAVE_EVERY
+		if full:
+			self.save()
+
+cache = UploadCache(CACHE_PATH) if CACHE_PATH else None
+if cache:
+	atexit.register(cache.save)
+pending = {}
+
+session = None
+
+def _session():
+	global session
+	if session is None:
+		session = httpx.Client(timeout=httpx.Timeout(120, connect=10))
+	return session
+
+def _nextChunk(chunk, sent, elapsed):
+	# Size the next chunk to take about CHUNK_SECONDS at the speed we just measured.
+	target = int(sent / elapsed * CHUNK_SECONDS) if elapsed > 0 else MAX_CHUNK
+	target = max(CHUNK_ALIGN, min(target, chunk * 2, MAX_CHUNK))
+	return target - target % CHUNK_ALIGN
+
+def _slices(view, start, end):
+	# Hand httpx views straight into the memory map, no copies of the file data.
+	for offset in range(start, end, SEND_SLICE):
+		yield view[offset:min(offset + SEND_SLICE, end)]
+
+def _retryable(error):
+	if isinstance(error, httpx.HTTPStatusError):
+		code = error.response.status_code
+		return code >= 500 or code in (408, 429)
+	return isinstance(error, httpx.TransportError)
+
+def uploadResumable(path, mime_type=None, progress=None):
+	size = os.path.getsize(path)
+	mime_type = mime_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+	response = _session().post(f"{BASE_URL}/upload/v1beta/files", headers={
+		"x-goog-api-key": API_KEY,
+		"X-Goog-Upload-Protocol": "resumable",
+		"X-Goog-Upload-Command": "start",
+		"X-Goog-Upload-Header-Content-Length": str(size),
+		"X-Goog-Upload-Header-Content-Type": mime_type,
+	}, json={"file": {"display_name": os.path.basename(path)}})
+	response.raise_for_status()
+	url = response.headers["x-goog-upload-url"]
+
+	with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+		view = memoryview(mapped)
+		try:
+			offset = 0
+			chunk = FIRST_CHUNK
+			failures = 0
+			resuming = False
+			while True:
+				try:
+					if resuming:
+						# Pick up from whatever the server acknowledged instead of starting over.
+						response = _session().post(url, headers={"X-Goog-Upload-Command": "query"})
+						response.raise_for_status()
+						if response.headers.get("x-goog-upload-status") == "final":
+							break
+						offset = int(response.headers["x-goog-upload-size-received"])
+						resuming = False
+
+					end = min(offset + chunk, size)
+					if end < size and hasattr(mapped, "madvise"):
+						ahead = end - end % mmap.PAGESIZE
+						mapped.madvise(mmap.MADV_WILLNEED, ahead, min(chunk, size - ahead))
+					began = time.perf_counter()
+					response = _session().post(url, headers={
+						"X-Goog-Upload-Command": "upload, finalize" if end == size else "upload",
+						"X-Goog-Upload-Offset": str(offset),
+						"Content-Length": str(end - offset),
+					}, content=_slices(view, offset, end))
+					response.raise_for_status()
+				except httpx.HTTPError as e:
+					failures += 1
+					if not _retryable(e) or failures > RETRIES:
+						raise
+					time.sleep(min(2 ** failures, 30))
+					chunk = max(CHUNK_ALIGN, chunk // 2)
+					resuming = True
+					continue
+
+				failures = 0
+				chunk = _nextChunk(chunk, end - offset, time.perf_counter() - began)
+				offset = end
+				if progress:
+					progress(offset, size)
+				if response.headers.get("x-goog-upload-status") != "active":
+					break
+		finally:
+			view.release()
+
+	if response.headers.get("x-goog-upload-status") != "final":
+		raise ValueError(f"Upload of {path} did not finalize.")
+	return types.File.model_validate(response.json()["file"])
+
+def _upload(client, path, progress):
+	if os.path.getsize(path) >= LARGE_FILE:
+		return uploadResumable(path, progress=progress)
+	return client.files.upload(file=path)
+
+def upload(client, path, progress=None, lifetime=0):
+	if cache is None:
+		return _upload(client, path, progress)
+	key = f"{BACKEND}:{fileHash(path)}"
+	file_ref = cache.get(key, lifetime)
+	if file_ref is None:
+		file_ref = _upload(client, path, progress)
+		cache.put(key, file_ref)
+	return file_ref
+
+async def uploadAsync(client, path):
+	if cache is None:
+		return await client.aio.files.upload(file=path)
+	key = f"{BACKEND}:{await asyncio.to_thread(fileHash, path)}"
+	file_ref = cache.get(key)
+	if file_ref is None:
+		# Identical files picked up at the same time share one upload.
+		if key not in pending:
+			pending[key] = asyncio.ensure_future(client.aio.files.upload(file=path))
+		try:
+			file_ref = await pending[key]
+		finally:
+			pending.pop(key, None)
+		cache.put(key, file_ref)
+	return file_ref
@@ -0,0 +1,85 @@
+from google.genai import types
+
+def validResponse(response):
+	if not response.candidates or not response.candidates[0].content:
+		return False
+	parts = response.candidates[0].content.parts
+	return bool(parts) and all(part != types.Part() and part.text != "" for part in parts)
+
+class WindowedChat:
+	# Like client.chats.create, but only a sliding window of recent turns is resent each time.
+	# The system instruction always stays, and with summarize=True the turns that fall out of
+	# the window are folded into one compact summary turn instead of being forgotten.
+	def __init__(self, client, model, config=None, max_turns=None, max_tokens=None, summarize=False):
+		self.client = client
+		self.model = model
+		self.config = config
+		self.max_turns = max_turns
+		self.max_tokens = max_tokens
+		self.summarize = summarize
+		self.summary = None
+		self.turns = []
+		# Size of everything we resend (system instruction, summary and window), kept up to
+		# date from usage_metadata as we go rather than recounting the history. The system
+		# instruction is counted once up front so it never gets charged to the first turn.
+		self.tokens = 0
+		instruction = config.system_instruction if config else None
+		if instruction:
+			self.tokens = client.models.count_tokens(model=model, contents=instruction).total_tokens or 0
+
+	def history(self):
+		contents = [self.summary["content"]] if self.summary else []
+		for turn in self.turns:
+			contents.extend(turn["contents"])
+		return contents
+
+	def send_message(self, message):
+		user = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+		response = self.client.models.generate_content(
+			model=self.model, contents=self.history() + [user], config=self.config
+		)
+		if not validResponse(response):
+			# Blocked or empty answers stay out of the history, like the SDK's own chats do.
+			return response
+		usage = response.usage_metadata
+		total = (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
+		self.turns.append({
+			"contents": [user, response.candidates[0].content],
+			"tokens": max(total - self.tokens, 0),
+		})
+		self.tokens = total
+		self._trim()
+		return response
+
+	def _overLimit(self, turns, tokens):
+		return (
+			(self.max_turns is not None and turns > self.max_turns) or
+			(self.max_tokens is not None and tokens > self.max_tokens)
+		)
+
+	def _trim(self):
+		if not self._overLimit(len(self.turns), self.tokens):
+			return
+		# When summarizing, trim down to half the budget so it happens in batches, not every turn.
+		scale = 2 if self.summarize else 1
+		dropped = []
+		while self.turns and self._overLimit(len(self.turns) * scale, self.tokens * scale):
+			dropped.append(self.turns.pop(0))
+			self.tokens -= dropped[-1]["tokens"]
+		if self.summarize:
+			self._summarize(dropped)
+
+	def _summarize(self, dropped):
+		contents = [self.summary["content"]] if self.summary else []
+		for turn in dropped:
+			contents.extend(turn["contents"])
+		contents.append("Summarize the conversation so far in a short paragraph, keeping any facts, names and decisions needed to continue it.")
+		response = self.client.models.generate_content(model=self.model, contents=contents)
+		if self.summary:
+			self.tokens -= self.summary["tokens"]
+		tokens = response.usage_metadata.candidates_token_count or 0
+		self.summary = {
+			"content": types.Content(role="user", parts=[types.Part.from_text(text=f"Summary of our conversation so far: {response.text}")]),
+			"tokens": tokens,
+		}
+		self.tokens += tokens